@@ -23,7 +23,7 @@ def cli() -> None:
         out_file = out_dir.joinpath(f"{public_api.distribution}__{public_api.package}__{public_api.version}__api.json")
         ensure_file_exists(out_file)
         with out_file.open("w") as f:
-            json.dump(public_api.to_json(), f, indent=2)
+            f.write(json.dumps(public_api.to_json(), indent=2))
 
     elif args.command == __USAGES_COMMAND:
         usages = find_usages(args.package, args.src, args.tmp)
@@ -36,7 +36,7 @@ def cli() -> None:
         )
         ensure_file_exists(out_file)
         with out_file.open("w") as f:
-            json.dump(usages.to_json(), f, indent=2)
+            usages.write_json(f)
 
     elif args.command == __IMPROVE_COMMAND:
         suggest_improvements(args.api, args.usages, args.out, args.min)
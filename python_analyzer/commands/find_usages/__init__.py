@@ -1,2 +1,2 @@
 from ._find_usages import find_usages
-from ._model import UsageStore, Usage
+from ._model import Location, UsageStore, Usage
@@ -1,3 +1,6 @@
+import functools
+import sys
+from itertools import chain, islice
 from typing import Optional
 
 import astroid
@@ -8,13 +11,25 @@ from ._model import UsageStore, Location
 
 
 class _UsageFinder:
+    __slots__ = ("package_name", "python_file", "usages", "called_cache")
+
     def __init__(self, package_name: str, python_file: str) -> None:
         self.package_name: str = package_name
         self.python_file: str = python_file
         self.usages: UsageStore = UsageStore()
+        self.called_cache: dict[tuple, Optional[tuple[astroid.NodeNG, str, astroid.Arguments, int]]] = {}
 
     def enter_call(self, node: astroid.Call):
-        called_tuple = _analyze_declaration_called_by(node, self.package_name)
+        # Call sites that reach the same definitions of the same dotted name call the same declaration, so we infer it
+        # only once per file
+        key = _callee_key(node.func)
+        if key is None:
+            called_tuple = _analyze_declaration_called_by(node, self.package_name)
+        elif key in self.called_cache:
+            called_tuple = self.called_cache[key]
+        else:
+            called_tuple = self.called_cache[key] = _analyze_declaration_called_by(node, self.package_name)
+
         if called_tuple is None:
             return
         called, function_qname, parameters, n_implicit_parameters = called_tuple
@@ -38,14 +53,37 @@ class _UsageFinder:
         self.usages.add_function_usage(function_qname, location)
 
         # Add parameter & value usage
+        parameter_qname_prefix = f"{function_qname}."
         for parameter_name, value in bound_parameters.items():
-            parameter_qname = f"{function_qname}.{parameter_name}"
+            parameter_qname = sys.intern(parameter_qname_prefix + parameter_name)
             self.usages.add_parameter_usage(parameter_qname, location)
 
             value = _stringify_value(value)
             self.usages.add_value_usage(parameter_qname, value, location)
 
 
+def _callee_key(func: astroid.NodeNG) -> Optional[tuple]:
+    """
+    Returns a key that is equal for called expressions that certainly refer to the same declaration, or None if the
+    called expression is not a (dotted) name. Names are resolved from the definitions that reach them, so two dotted
+    names with the same attributes refer to the same declaration if their heads are bound by the same definitions.
+    """
+
+    attribute_names = []
+    head = func
+    while isinstance(head, astroid.Attribute):
+        attribute_names.append(head.attrname)
+        head = head.expr
+    if not isinstance(head, astroid.Name):
+        return None
+
+    scope, assignments = head.lookup(head.name)
+    if len(assignments) == 0:
+        return None
+
+    return scope, tuple(assignments), head.name, tuple(attribute_names)
+
+
 def _analyze_declaration_called_by(node: astroid.Call, package_name: str) -> Optional[
     tuple[astroid.NodeNG, str, astroid.Arguments, int]]:
     """
@@ -53,6 +91,9 @@ def _analyze_declaration_called_by(node: astroid.Call, package_name: str) -> Opt
     returns a tuple with the form (called, qualified_name, parameters, n_implicit_parameters).
     """
 
+    if __is_certainly_irrelevant_callee(node.func, package_name):
+        return None
+
     called = safe_infer(node.func)
     if called is None or not __is_relevant_qualified_name(
         package_name,
@@ -68,19 +109,63 @@ def _analyze_declaration_called_by(node: astroid.Call, package_name: str) -> Opt
             return None
 
     if isinstance(called, (astroid.BoundMethod, astroid.UnboundMethod, astroid.FunctionDef)):
-        return called, called.qname(), called.args, n_implicit_parameters
+        # The same names are used as keys for many usages, so interning them speeds up lookups and saves memory
+        return called, sys.intern(called.qname()), called.args, n_implicit_parameters
     else:
         return None
 
 
+def __is_certainly_irrelevant_callee(func: astroid.NodeNG, package_name: str) -> bool:
+    """
+    Returns whether the called expression can be ruled out without inference, which is much more expensive. This is the
+    case if it is a (dotted) name whose head refers to a builtin or only to modules imported by an import statement
+    that are outside the package (e.g. "np.array" after "import numpy as np").
+    """
+
+    head = func
+    while isinstance(head, astroid.Attribute):
+        head = head.expr
+    if not isinstance(head, astroid.Name):
+        return False
+
+    scope, assignments = head.lookup(head.name)
+    if len(assignments) == 0:
+        return False
+
+    if isinstance(scope, astroid.Module) and scope.name == "builtins":
+        return True
+
+    for assignment in assignments:
+        if not isinstance(assignment, astroid.Import):
+            return False
+
+        for module_name, alias in assignment.names:
+            imported_name = module_name if alias is not None else module_name.split(".")[0]
+            if (alias or imported_name) != head.name:
+                continue
+
+            # The imported module is either part of the package or one of its parents (e.g. "import google" for the
+            # package "google.cloud")
+            if __is_relevant_qualified_name(package_name, imported_name) or \
+                    __is_relevant_qualified_name(imported_name, package_name):
+                return False
+
+    return True
+
+
 def __is_relevant_qualified_name(package_name: str, qualified_name: str) -> bool:
-    return qualified_name.startswith(package_name)
+    # Checking for the dot ensures that e.g. "sklearn_extra" is not considered part of "sklearn". Slicing instead of
+    # building the prefix avoids allocating a string for every inferred callee.
+    return qualified_name.startswith(package_name) and \
+        qualified_name[len(package_name):len(package_name) + 1] in ("", ".")
 
 
 def __n_implicit_parameters(called: astroid.NodeNG) -> int:
     return called.implicit_parameters() if hasattr(called, "implicit_parameters") else 0
 
 
+# Nodes are hashed by identity and classes of the package stay in the astroid cache, so the same class is resolved once
+@functools.lru_cache(maxsize=4096)
 def __called_constructor(class_def: astroid.ClassDef) -> Optional[astroid.FunctionDef]:
     try:
         # Use last __init__
@@ -109,12 +194,12 @@ def _bound_parameters(
 
     result: dict[str, astroid.NodeNG] = arguments.keyword_arguments.copy()
 
-    positional_parameter_names = [it.name for it in (parameters.posonlyargs + parameters.args)][n_implicit_parameters:]
+    # zip stops at the shorter sequence, so surplus positional arguments are ignored
+    result.update(zip(__positional_parameter_names(parameters, n_implicit_parameters), arguments.positional_arguments))
 
-    for index, arg in enumerate(arguments.positional_arguments):
-        if index >= len(positional_parameter_names):
-            break
+    return result
 
-        result[positional_parameter_names[index]] = arg
 
-    return result
+@functools.lru_cache(maxsize=4096)
+def __positional_parameter_names(parameters: astroid.Arguments, n_implicit_parameters: int) -> tuple[str, ...]:
+    return tuple(it.name for it in islice(chain(parameters.posonlyargs, parameters.args), n_implicit_parameters, None))
@@ -1,97 +1,218 @@
 import json
 import multiprocessing
+import os
+import sys
+import uuid
 from pathlib import Path
+from typing import Optional
 
 import astroid
 
-from python_analyzer.utils import initialize_and_read_exclude_file, list_files, ASTWalker
+from python_analyzer.commands.get_api import distribution, distribution_version, package_files, package_root
+from python_analyzer.utils import file_contains, initialize_and_read_exclude_file, list_files, read_source
 from ._ast_visitor import _UsageFinder
 from ._model import UsageStore
+from ._usage_cache import _read_cached_usages, _usage_cache_file, _write_cached_usages
 
-__N_PROCESSES = 12
+__N_PROCESSES = os.cpu_count() or 1
+__EXCLUDE_FILE_FLUSH_INTERVAL = 64
+__MAX_FILES_PER_PROCESS = 256
 
 
 def find_usages(package_name: str, src_dir: Path, tmp_dir: Path):
     candidate_python_files = list_files(src_dir, ".py")
 
     exclude_file = tmp_dir.joinpath("$$$$$exclude$$$$$.txt")
-    excluded_python_files = set(initialize_and_read_exclude_file(exclude_file))
+    excluded_python_files = {__normalize_path(it) for it in initialize_and_read_exclude_file(exclude_file)}
 
-    python_files = [it for it in candidate_python_files if it not in excluded_python_files]
+    # Paths are compared in normalized form, so spelling the source directory differently when resuming an analysis
+    # (e.g. relative instead of absolute) does not lead to files being analyzed again
+    python_files = list({
+        normalized_path: it
+        for it in candidate_python_files
+        if (normalized_path := __normalize_path(it)) not in excluded_python_files
+    }.values())
+
+    # Start with the largest files, so no worker is still busy with a large file when all others are done
+    python_files.sort(key=os.path.getsize, reverse=True)
 
     tmp_dir.mkdir(parents=True, exist_ok=True)
 
-    lock = multiprocessing.Lock()
+    package_version = distribution_version(distribution(package_name))
+
+    # Forked workers share the modules that were already parsed by the main process, so inference does not parse the
+    # modules of the package again in every worker. We keep the default start method, so this only helps where it forks
+    # anyway. macOS is skipped, since forking there is unsafe once system frameworks have been loaded.
+    if multiprocessing.get_start_method() == "fork" and sys.platform != "darwin":
+        __warm_astroid_cache(package_name)
+
+    # astroid keeps inference results for every analyzed file, so workers are replaced after a fixed number of files to
+    # bound their memory. Forked replacements start from the warm cache of the main process again.
     with multiprocessing.Pool(
         processes=__N_PROCESSES,
         initializer=__initialize_process_environment,
-        initargs=(lock,)
-    ) as pool:
-        pool.starmap(
-            __find_usages_in_single_file,
-            [[package_name, it, exclude_file, tmp_dir] for it in python_files]
-        )
-    pool.join()
-    pool.close()
+        initargs=(package_name, package_version, tmp_dir),
+        maxtasksperchild=__MAX_FILES_PER_PROCESS
+    ) as pool, exclude_file.open("a", buffering=1 << 16) as f:
+        # Only the main process writes to the exclude file and to stdout, so workers never wait for each other.
+        # Flushing in batches means that at most a batch of files is processed again after a crash.
+        for index, (python_file, skip_reason) in enumerate(
+            pool.imap_unordered(__find_usages_in_single_file, python_files)
+        ):
+            if skip_reason is None:
+                print(f"Analyzed {python_file} ({index + 1}/{len(python_files)})")
+            else:
+                print(f"Skipped {python_file} ({skip_reason}) ({index + 1}/{len(python_files)})")
+
+            f.write(f"{python_file}\n")
+            if (index + 1) % __EXCLUDE_FILE_FLUSH_INTERVAL == 0:
+                f.flush()
 
     return _merge_results(tmp_dir)
 
 
-def __initialize_process_environment(lock: multiprocessing.Lock):
+def __warm_astroid_cache(package_name: str) -> None:
+    # Warming the cache is best effort. The analyzed package need not be importable in the environment of the analyzer,
+    # and importing it runs arbitrary code that may fail. Workers then parse the modules of the package on demand.
+    try:
+        module_path_prefix = os.path.join(str(package_root(package_name).parent), "")
+        files = package_files(package_name)
+    except Exception:  # pylint: disable=broad-except
+        return
+
+    for file in files:
+        module_name = file.removeprefix(module_path_prefix).removesuffix(".py").replace(os.sep, ".")
+        try:
+            astroid.MANAGER.ast_from_file(file, module_name.removesuffix(".__init__"), source=True)
+        except astroid.AstroidBuildingError:
+            # The module is parsed again (and fails again) if inference needs it
+            pass
+
+
+def __normalize_path(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+def __initialize_process_environment(package_name: str, package_version: Optional[str], tmp_dir: Path):
     # noinspection PyGlobalUndefined
-    global _lock
-    _lock = lock
+    global _package_name, _package_version, _shard
+    _package_name = package_name
+    _package_version = package_version
+
+    # Each worker appends to its own shard, so workers never share a file and no file is created per analyzed file.
+    # The shard is never closed explicitly, since the pool terminates its workers. PIDs are reused (e.g. when resuming
+    # in a container), so the name must also be unique per worker start. Otherwise, a new worker would append its first
+    # line to the truncated last line a crashed worker may have left behind, and both would be lost.
+    shard_file = tmp_dir.joinpath(f"$$$$$usages-{os.getpid()}-{uuid.uuid4().hex}$$$$$.jsonl")
+    _shard = shard_file.open("a", encoding="utf-8", buffering=1 << 20)
 
 
-def __find_usages_in_single_file(
-    package_name: str,
-    python_file: str,
-    exclude_file: Path,
-    tmp_dir: Path,
-):
-    print(f"Working on {python_file}")
+def __find_usages_in_single_file(python_file: str) -> tuple[str, Optional[str]]:
+    """
+    Finds usages in the given file and appends them to the shard of this worker in the temporary directory.
+
+    :return: The processed file and the reason why it was skipped (None if it was analyzed), so the main process can
+    report the progress and add the file to the exclude file.
+    """
 
     try:
-        with open(python_file, "r") as f:
-            source = f.read()
-
-        if __is_relevant_python_file(package_name, source):
-            usage_finder = _UsageFinder(package_name, python_file)
-            ASTWalker(usage_finder).walk(astroid.parse(source))
-
-            tmp_file = tmp_dir.joinpath(
-                python_file.replace("/", "__").replace("\\", "__").replace(".py", ".json")
-            )
-            with tmp_file.open("w") as f:
-                json.dump(usage_finder.usages.to_json(), f, indent=2)
-        else:
-            print(f"Skipping {python_file} (irrelevant file)")
+        # Most files are irrelevant, so we check this on the raw bytes before decoding and parsing them
+        if not __is_relevant_python_file(_package_name, python_file):
+            return python_file, "irrelevant file"
+
+        source = read_source(python_file)
+
+        cache_file = _usage_cache_file(_package_name, _package_version, python_file, source)
+        line = _read_cached_usages(cache_file) if cache_file is not None else None
+
+        if line is None:
+            usage_finder = _UsageFinder(_package_name, python_file)
+            # Only calls are relevant, so we skip the dispatch for all other nodes
+            for node in astroid.parse(source).nodes_of_class(astroid.Call):
+                usage_finder.enter_call(node)
+
+            # Intermediate results are only read by _merge_results, so they are not indented
+            line = json.dumps({"file": python_file, "usages": usage_finder.usages.to_json()}, separators=(",", ":"))
+
+            if cache_file is not None:
+                _write_cached_usages(cache_file, line)
+
+        # The line is flushed before the main process adds the file to the exclude file, so no results are lost if the
+        # analysis crashes
+        _shard.write(f"{line}\n")
+        _shard.flush()
 
     except UnicodeError:
-        print(f"Skipping {python_file} (broken encoding)")
+        return python_file, "broken encoding"
     except astroid.exceptions.AstroidSyntaxError:
-        print(f"Skipping {python_file} (invalid syntax)")
+        return python_file, "invalid syntax"
     except RecursionError:
-        print(f"Skipping {python_file} (infinite recursion)")
+        return python_file, "infinite recursion"
 
-    with _lock:
-        with exclude_file.open("a") as f:
-            f.write(f"{python_file}\n")
+    return python_file, None
 
 
-def __is_relevant_python_file(package_name: str, source_code: str) -> bool:
-    return package_name in source_code
+def __is_relevant_python_file(package_name: str, python_file: str) -> bool:
+    return file_contains(python_file, package_name.encode())
 
 
 def _merge_results(tmp_dir: Path) -> UsageStore:
-    result = UsageStore()
+    shards = list_files(tmp_dir, ".jsonl")
 
-    files = list_files(tmp_dir, ".json")
-    for index, file in enumerate(files):
-        print(f"Merging {file} ({index + 1}/{len(files)})")
+    # Parsing the intermediate results dominates the merge, so every shard is first merged by its own process
+    with multiprocessing.Pool(processes=__N_PROCESSES) as pool:
+        partial_results = pool.map(__merge_shard, shards)
 
-        with open(file, "r") as f:
-            other_usage_store = UsageStore.from_json(json.load(f))
-            result.merge_other_into_self(other_usage_store)
+    result = UsageStore()
+    merged_python_files: set[str] = set()
+
+    # The largest partial result becomes the base, so the fewest usages have to be added to it one by one
+    partial_results = sorted(zip(shards, partial_results), key=lambda it: len(it[1][0]), reverse=True)
+    for index, (shard, (python_files, usages_json)) in enumerate(partial_results):
+        print(f"Merging {shard} ({index + 1}/{len(partial_results)})")
+
+        # A file is analyzed again if the analysis crashed before it was added to the exclude file, so the shard is
+        # merged again without the files that are already part of the result
+        if not merged_python_files.isdisjoint(python_files):
+            python_files, usages_json = __merge_shard(shard, merged_python_files)
+        merged_python_files.update(python_files)
+
+        usages = UsageStore.from_json(json.loads(usages_json))
+        if index == 0:
+            result = usages
+        else:
+            result.merge_other_into_self(usages)
 
     return result
+
+
+def __merge_shard(shard: str, skipped_python_files: Optional[set[str]] = None) -> tuple[list[str], str]:
+    """
+    Merges the usages in the given shard.
+
+    :param shard: The path to the shard.
+    :param skipped_python_files: Python files whose usages should not be merged.
+    :return: The merged Python files and their usages as compact JSON, which is much cheaper to send to the main process
+    than the usage store itself.
+    """
+
+    usages = UsageStore()
+    python_files: list[str] = []
+    seen_python_files = set(skipped_python_files or ())
+
+    with open(shard, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # The last line of a shard is incomplete if the analysis crashed while writing it
+                continue
+
+            if entry["file"] in seen_python_files:
+                continue
+            seen_python_files.add(entry["file"])
+            python_files.append(entry["file"])
+
+            usages.merge_other_into_self(UsageStore.from_json(entry["usages"]))
+
+    return python_files, json.dumps(usages.to_json(), separators=(",", ":"))
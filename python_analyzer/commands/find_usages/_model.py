@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from typing import Any, Optional
+import json
+import sys
+from typing import Any, Iterable, Optional, TextIO
 
 ClassQName = str
 FunctionQName = str
@@ -14,30 +16,47 @@ class UsageStore:
     def from_json(json: Any) -> UsageStore:
         result = UsageStore()
 
+        # Names, values and files repeat across many usages and intermediate results, so they are interned to share a
+        # single string object each in the merged store. Likewise, a call adds usages of a function, its class, its
+        # parameters and their values at the same location, so equal locations share a single object.
+        revived_locations: dict[tuple[FileName, Optional[LineNumber], Optional[ColumnNumber]], Location] = {}
+
+        def revive_location(location_json: Any) -> Location:
+            key = (location_json["file"], location_json["line"], location_json["column"])
+            location = revived_locations.get(key)
+            if location is None:
+                location = revived_locations[key] = Location.from_json(location_json)
+            return location
+
         # Revive class usages
         class_usages = json["class_usages"]
         for qname, locations in class_usages.items():
+            qname = sys.intern(qname)
             for location in locations:
-                result.add_class_usage(qname, Location.from_json(location))
+                result.add_class_usage(qname, revive_location(location))
 
         # Revive function usages
         function_usages = json["function_usages"]
         for qname, locations in function_usages.items():
+            qname = sys.intern(qname)
             for location in locations:
-                result.add_function_usage(qname, Location.from_json(location))
+                result.add_function_usage(qname, revive_location(location))
 
         # Revive parameter usages
         parameter_usages = json["parameter_usages"]
         for qname, locations in parameter_usages.items():
+            qname = sys.intern(qname)
             for location in locations:
-                result.add_parameter_usage(qname, Location.from_json(location))
+                result.add_parameter_usage(qname, revive_location(location))
 
         # Revive value usages
         value_usages = json["value_usages"]
         for parameter_qname, values in value_usages.items():
+            parameter_qname = sys.intern(parameter_qname)
             for value, locations in values.items():
+                value = sys.intern(value)
                 for location in locations:
-                    result.add_value_usage(parameter_qname, value, Location.from_json(location))
+                    result.add_value_usage(parameter_qname, value, revive_location(location))
 
         return result
 
@@ -48,58 +67,80 @@ class UsageStore:
         self.value_usages: dict[ParameterQName, dict[StringifiedValue, list[ValueUsage]]] = {}
 
     def add_class_usage(self, qname: ClassQName, location: Location) -> None:
-        self.init_class(qname)
-        self.class_usages[qname].append(ClassUsage(qname, location))
+        usages = self.class_usages.get(qname)
+        if usages is None:
+            usages = self.class_usages[qname] = []
+        usages.append(ClassUsage(qname, location))
 
     def init_class(self, qname: ClassQName) -> None:
         if qname not in self.class_usages:
             self.class_usages[qname] = []
 
     def remove_class(self, class_qname: ClassQName) -> None:
-        if class_qname in self.class_usages:
-            del self.class_usages[class_qname]
+        self.remove_classes([class_qname])
+
+    def remove_classes(self, class_qnames: Iterable[ClassQName]) -> None:
+        # str.startswith accepts a tuple of prefixes, so the methods of all classes are found in a single pass
+        class_qnames = tuple(class_qnames)
+        if not class_qnames:
+            return
+
+        for class_qname in class_qnames:
+            self.class_usages.pop(class_qname, None)
 
-        for function_qname in list(self.function_usages.keys()):
-            if function_qname.startswith(class_qname):
-                self.remove_function(function_qname)
+        self.remove_functions([it for it in self.function_usages if it.startswith(class_qnames)])
 
     def add_function_usage(self, qname: FunctionQName, location: Location) -> None:
-        self.init_function(qname)
-        self.function_usages[qname].append(FunctionUsage(qname, location))
+        usages = self.function_usages.get(qname)
+        if usages is None:
+            usages = self.function_usages[qname] = []
+        usages.append(FunctionUsage(qname, location))
 
     def init_function(self, qname: FunctionQName) -> None:
         if qname not in self.function_usages:
             self.function_usages[qname] = []
 
     def remove_function(self, function_qname: FunctionQName) -> None:
-        if function_qname in self.function_usages:
-            del self.function_usages[function_qname]
+        self.remove_functions([function_qname])
 
-        for parameter_qname in list(self.parameter_usages.keys()):
-            if parameter_qname.startswith(function_qname):
-                self.remove_parameter(parameter_qname)
+    def remove_functions(self, function_qnames: Iterable[FunctionQName]) -> None:
+        function_qnames = tuple(function_qnames)
+        if not function_qnames:
+            return
+
+        for function_qname in function_qnames:
+            self.function_usages.pop(function_qname, None)
+
+        self.remove_parameters([it for it in self.parameter_usages if it.startswith(function_qnames)])
 
     def add_parameter_usage(self, qname: ParameterQName, location: Location) -> None:
-        self.init_parameter(qname)
-        self.parameter_usages[qname].append(ParameterUsage(qname, location))
+        usages = self.parameter_usages.get(qname)
+        if usages is None:
+            usages = self.parameter_usages[qname] = []
+        usages.append(ParameterUsage(qname, location))
 
     def init_parameter(self, qname: ParameterQName) -> None:
         if qname not in self.parameter_usages:
             self.parameter_usages[qname] = []
 
     def remove_parameter(self, qname: ParameterQName) -> None:
-        if qname in self.parameter_usages:
-            del self.parameter_usages[qname]
+        self.remove_parameters([qname])
 
-        self.remove_value(qname)
+    def remove_parameters(self, qnames: Iterable[ParameterQName]) -> None:
+        for qname in qnames:
+            self.parameter_usages.pop(qname, None)
+            self.value_usages.pop(qname, None)
 
     def add_value_usage(self, parameter_qname: ParameterQName, value: StringifiedValue, location: Location) -> None:
-        self.init_value(parameter_qname)
+        values = self.value_usages.get(parameter_qname)
+        if values is None:
+            values = self.value_usages[parameter_qname] = {}
 
-        if value not in self.value_usages[parameter_qname]:
-            self.value_usages[parameter_qname][value] = []
+        usages = values.get(value)
+        if usages is None:
+            usages = values[value] = []
 
-        self.value_usages[parameter_qname][value].append(ValueUsage(parameter_qname, value, location))
+        usages.append(ValueUsage(parameter_qname, value, location))
 
     def init_value(self, parameter_qname: ParameterQName) -> None:
         if parameter_qname not in self.value_usages:
@@ -155,26 +196,28 @@ class UsageStore:
         :return: This usage store.
         """
 
+        # Usages are never modified, so they are shared by both stores. The lists are copied, however, since adding
+        # usages to this store must not change the other one.
+
         # Merge class usages
-        for usages in other_usage_store.class_usages.values():
-            for usage in usages:
-                self.add_class_usage(usage.qname, usage.location)
+        _extend_usage_lists(self.class_usages, other_usage_store.class_usages)
 
         # Merge function usages
-        for usages in other_usage_store.function_usages.values():
-            for usage in usages:
-                self.add_function_usage(usage.qname, usage.location)
+        _extend_usage_lists(self.function_usages, other_usage_store.function_usages)
 
         # Merge parameter usages
-        for usages in other_usage_store.parameter_usages.values():
-            for usage in usages:
-                self.add_parameter_usage(usage.qname, usage.location)
+        _extend_usage_lists(self.parameter_usages, other_usage_store.parameter_usages)
 
         # Merge value usages
-        for values in other_usage_store.value_usages.values():
-            for usages in values.values():
-                for usage in usages:
-                    self.add_value_usage(usage.parameter_qname, usage.value, usage.location)
+        for parameter_qname, values in other_usage_store.value_usages.items():
+            if len(values) == 0:
+                continue
+
+            own_values = self.value_usages.get(parameter_qname)
+            if own_values is None:
+                own_values = self.value_usages[parameter_qname] = {}
+
+            _extend_usage_lists(own_values, values)
 
         return self
 
@@ -213,6 +256,43 @@ class UsageStore:
             },
         }
 
+    def write_json(self, f: TextIO) -> None:
+        """
+        Writes the same JSON as to_json to the given file, but only builds the JSON of a single name at a time instead
+        of the whole document. Each name is written on its own line.
+
+        :param f: The file to write to.
+        """
+
+        f.write('{"class_usages":')
+        _write_json_object(f, (
+            (qname, [usage.location.to_json() for usage in usages])
+            for qname, usages in self.class_usages.items()
+        ))
+
+        f.write(',"function_usages":')
+        _write_json_object(f, (
+            (qname, [usage.location.to_json() for usage in usages])
+            for qname, usages in self.function_usages.items()
+        ))
+
+        f.write(',"parameter_usages":')
+        _write_json_object(f, (
+            (qname, [usage.location.to_json() for usage in usages])
+            for qname, usages in self.parameter_usages.items()
+        ))
+
+        f.write(',"value_usages":')
+        _write_json_object(f, (
+            (parameter_qname, {
+                value: [usage.location.to_json() for usage in usages]
+                for value, usages in values.items()
+            })
+            for parameter_qname, values in self.value_usages.items()
+        ))
+
+        f.write("}\n")
+
     def to_count_json(self) -> Any:
         return {
             "class_counts": {
@@ -252,10 +332,38 @@ class UsageStore:
             }
         }
 
+
+def _extend_usage_lists(usages: dict[str, list[Usage]], other_usages: dict[str, list[Usage]]) -> None:
+    for key, other_usage_list in other_usages.items():
+        # Like adding the usages one by one, merging does not initialize entries without usages
+        if len(other_usage_list) == 0:
+            continue
+
+        usage_list = usages.get(key)
+        if usage_list is None:
+            usages[key] = other_usage_list.copy()
+        else:
+            usage_list.extend(other_usage_list)
+
+
+def _write_json_object(f: TextIO, entries: Iterable[tuple[str, Any]]) -> None:
+    f.write("{")
+
+    separator = "\n"
+    for key, value in entries:
+        f.write(f"{separator}{json.dumps(key)}:{json.dumps(value, separators=(',', ':'))}")
+        separator = ",\n"
+
+    f.write("\n}")
+
+
 class Usage:
-    pass
+    # There is one usage object per usage, so they do without an instance dictionary
+    __slots__ = ()
 
 class ClassUsage(Usage):
+    __slots__ = ("qname", "location")
+
     def __init__(self, qname: ClassQName, location: Location) -> None:
         self.qname: ClassQName = qname
         self.location: Location = location
@@ -268,6 +376,8 @@ class ClassUsage(Usage):
 
 
 class FunctionUsage(Usage):
+    __slots__ = ("qname", "location")
+
     def __init__(self, qname: FunctionQName, location: Location) -> None:
         self.qname: FunctionQName = qname
         self.location: Location = location
@@ -280,6 +390,8 @@ class FunctionUsage(Usage):
 
 
 class ParameterUsage(Usage):
+    __slots__ = ("qname", "location")
+
     def __init__(self, qname: ParameterQName, location: Location) -> None:
         self.qname: ParameterQName = qname
         self.location: Location = location
@@ -292,6 +404,8 @@ class ParameterUsage(Usage):
 
 
 class ValueUsage(Usage):
+    __slots__ = ("parameter_qname", "value", "location")
+
     def __init__(self, parameter_qname: ParameterQName, value: StringifiedValue, location: Location) -> None:
         self.parameter_qname: ParameterQName = parameter_qname
         self.value: StringifiedValue = value
@@ -311,11 +425,12 @@ ColumnNumber = int
 
 
 class Location:
+    __slots__ = ("file", "line", "column")
 
     @staticmethod
     def from_json(json: Any) -> Location:
         return Location(
-            json["file"],
+            sys.intern(json["file"]),
             json["line"],
             json["column"]
         )
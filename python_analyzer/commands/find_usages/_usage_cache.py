@@ -0,0 +1,38 @@
+from pathlib import Path
+from typing import Optional
+
+from python_analyzer.utils import cache_file, read_cache_file, write_cache_file
+
+__CACHE_DIR_ENVIRONMENT_VARIABLE = "PYTHON_ANALYZER_USAGE_CACHE"
+
+
+def _usage_cache_file(
+    package_name: str,
+    package_version: Optional[str],
+    python_file: str,
+    source: str
+) -> Optional[Path]:
+    """
+    Returns the file that caches the usages found in the given source code, or None if the environment variable
+    PYTHON_ANALYZER_USAGE_CACHE is not set to a directory.
+
+    :param package_name: The name of the package whose usages are found.
+    :param package_version: The installed version of the package, since inference depends on its code.
+    :param python_file: The path of the file containing the source code, since it is part of every location.
+    :param source: The source code.
+    :return: The cache file, which may not exist yet.
+    """
+
+    return cache_file(__CACHE_DIR_ENVIRONMENT_VARIABLE, (package_name, package_version, python_file), source, ".json")
+
+
+def _read_cached_usages(file: Path) -> Optional[str]:
+    data = read_cache_file(file)
+    if data is None:
+        return None
+
+    return data.decode("utf-8")
+
+
+def _write_cached_usages(file: Path, usages: str) -> None:
+    write_cache_file(file, lambda f: f.write(usages.encode("utf-8")))
@@ -1,11 +1,14 @@
+import re
 from typing import Optional
 
 import astroid
 
 from python_analyzer.utils import parent_qname
-from ._file_filters import _is_init_file
 from ._model import API, Function, Parameter, Class
 
+# Matches a component of a qualified name that starts with an underscore
+_PRIVATE_COMPONENT = re.compile(r"(?:^|\.)_")
+
 
 class _CallableVisitor:
     def __init__(self, api: API) -> None:
@@ -14,12 +17,9 @@ class _CallableVisitor:
 
     def enter_module(self, module_node: astroid.Module):
         """
-        Find re-exported declarations in __init__.py files.
+        Find re-exported declarations in __init__.py files. This must only be called for __init__.py files.
         """
 
-        if not _is_init_file(module_node.file):
-            return
-
         for _, global_declaration_node_list in module_node.globals.items():
             global_declaration_node = global_declaration_node_list[0]
 
@@ -65,27 +65,20 @@ class _CallableVisitor:
         parameters: astroid.Arguments = node.args
         n_implicit_parameters = node.implicit_parameters()
 
-        result = [(it.name, None) for it in parameters.posonlyargs]
-        result += [
-            (
-                it.name,
-                _CallableVisitor.__parameter_default(
-                    parameters.defaults,
-                    index - len(parameters.args) + len(parameters.defaults)
-                )
-            )
-            for index, it in enumerate(parameters.args)
-        ]
-        result += [
-            (
-                it.name,
-                _CallableVisitor.__parameter_default(
-                    parameters.kw_defaults,
-                    index - len(parameters.kwonlyargs) + len(parameters.kw_defaults)
-                )
-            )
-            for index, it in enumerate(parameters.kwonlyargs)
-        ]
+        result: list[tuple[str, Optional[str]]] = [(it.name, None) for it in parameters.posonlyargs]
+
+        # Defaults belong to the last parameters, so the first ones might not have one
+        defaults = parameters.defaults
+        first_index_with_default = len(parameters.args) - len(defaults)
+        for index, it in enumerate(parameters.args):
+            default = defaults[index - first_index_with_default] if index >= first_index_with_default else None
+            result.append((it.name, default.as_string() if default is not None else None))
+
+        kw_defaults = parameters.kw_defaults
+        first_index_with_default = len(parameters.kwonlyargs) - len(kw_defaults)
+        for index, it in enumerate(parameters.kwonlyargs):
+            default = kw_defaults[index - first_index_with_default] if index >= first_index_with_default else None
+            result.append((it.name, default.as_string() if default is not None else None))
 
         return [
             Parameter(name, default, function_is_public)
@@ -93,16 +86,6 @@ class _CallableVisitor:
             if name != "self"
         ]
 
-    @staticmethod
-    def __parameter_default(defaults: list[astroid.NodeNG], default_index: int) -> Optional[str]:
-        if 0 <= default_index < len(defaults):
-            default = defaults[default_index]
-            if default is None:
-                return None
-            return default.as_string()
-        else:
-            return None
-
     def is_public(self, name: str, qualified_name: str) -> bool:
         if name.startswith("_") and not name.endswith("__"):
             return False
@@ -111,8 +94,9 @@ class _CallableVisitor:
             return True
 
         # Containing class is re-exported (always false if the current API element is not a method)
-        if parent_qname(qualified_name) in self.reexported:
+        parent = parent_qname(qualified_name)
+        if parent in self.reexported:
             return True
 
-        # The slicing is necessary so __init__ functions are not excluded (already handled in the first condition).
-        return all(not it.startswith("_") for it in qualified_name.split(".")[:-1])
+        # Only the parents are checked so __init__ functions are not excluded (already handled in the first condition).
+        return _PRIVATE_COMPONENT.search(parent) is None
@@ -1,6 +1,17 @@
+import os
+
+
 def _is_init_file(path: str) -> bool:
     return path.endswith("__init__.py")
 
 
 def _is_test_file(posix_path: str) -> bool:
     return "/test/" in posix_path or "/tests/" in posix_path
+
+
+def _to_posix_path(path: str) -> str:
+    # Paths from list_files are plain strings, so we only need to swap separators instead of building a Path
+    if os.sep == "/":
+        return path
+
+    return path.replace(os.sep, "/")
@@ -1,10 +1,12 @@
-from pathlib import Path
+import multiprocessing
+import os
+from typing import Optional
 
 import astroid
 
-from python_analyzer.utils import ASTWalker
+from python_analyzer.utils import parse_cached, read_source
 from ._ast_visitor import _CallableVisitor
-from ._file_filters import _is_test_file
+from ._file_filters import _is_init_file, _to_posix_path
 from ._model import API
 from ._package_metadata import distribution, distribution_version, package_files, package_root
 
@@ -15,31 +17,96 @@ def get_api(package_name: str) -> API:
     dist_version = distribution_version(dist)
     files = package_files(package_name)
 
+    # Module names are derived from file paths relative to the parent of the package root
+    module_path_prefix = os.path.join(str(root.parent), "")
+
     api = API(dist, package_name, dist_version)
     callable_visitor = _CallableVisitor(api)
-    walker = ASTWalker(callable_visitor)
-
-    for file in files:
-        posix_path = Path(file).as_posix()
-        print(f"Working on file {posix_path}")
-
-        if _is_test_file(posix_path):
-            print("Skipping test file")
-            continue
-
-        with open(file, "r") as f:
-            source = f.read()
-            walker.walk(
-                astroid.parse(
-                    source,
-                    module_name=__module_name(root, Path(file)),
-                    path=file
-                )
-            )
+
+    init_files = [it for it in files if _is_init_file(it)]
+    other_files = [it for it in files if not _is_init_file(it)]
+
+    # Pass 1: __init__.py files determine the re-exported declarations, which decide whether a declaration is public
+    init_modules = []
+    for file in init_files:
+        __print_progress(file)
+        init_modules.append(__parse_file(module_path_prefix, file))
+
+    for module in init_modules:
+        callable_visitor.enter_module(module)
+
+    # Pass 2: Find the declarations in all files, now that the re-exported declarations are known
+    for module in init_modules:
+        __visit_declarations(callable_visitor, module)
+
+    with multiprocessing.Pool(
+        initializer=__initialize_process_environment,
+        initargs=(module_path_prefix, dist, package_name, dist_version, callable_visitor.reexported)
+    ) as pool:
+        # Only the main process writes to stdout. Results arrive in the order of the files, so we can report them here.
+        for file, other_api in zip(other_files, pool.imap(__get_api_in_single_file, other_files, chunksize=16)):
+            __print_progress(file)
+            __merge_other_into_api(api, other_api)
+
+    return api
+
+
+def __initialize_process_environment(
+    module_path_prefix: str,
+    dist: Optional[str],
+    package_name: str,
+    dist_version: Optional[str],
+    reexported: set[str]
+):
+    # noinspection PyGlobalUndefined
+    global _module_path_prefix, _dist, _package_name, _dist_version, _reexported
+    _module_path_prefix = module_path_prefix
+    _dist = dist
+    _package_name = package_name
+    _dist_version = dist_version
+    _reexported = reexported
+
+
+def __get_api_in_single_file(file: str) -> API:
+    callable_visitor = _CallableVisitor(API(_dist, _package_name, _dist_version))
+    callable_visitor.reexported = _reexported
+
+    __visit_declarations(callable_visitor, __parse_file(_module_path_prefix, file))
 
     return callable_visitor.api
 
 
-def __module_name(root: Path, file: Path) -> str:
-    relative_path = file.relative_to(root.parent).as_posix()
-    return str(relative_path).replace(".py", "").replace("/", ".")
+def __print_progress(file: str) -> None:
+    print(f"Working on file {_to_posix_path(file)}")
+
+
+def __parse_file(module_path_prefix: str, file: str) -> astroid.Module:
+    return parse_cached(
+        read_source(file),
+        module_name=__module_name(module_path_prefix, file),
+        path=file
+    )
+
+
+def __visit_declarations(callable_visitor: _CallableVisitor, module: astroid.Module) -> None:
+    # Only classes and functions are relevant, so we skip the dispatch for all other nodes
+    for node in module.nodes_of_class((astroid.ClassDef, astroid.FunctionDef)):
+        if isinstance(node, astroid.ClassDef):
+            callable_visitor.enter_classdef(node)
+        else:
+            callable_visitor.enter_functiondef(node)
+
+
+def __merge_other_into_api(api: API, other_api: API) -> None:
+    # Declarations that were already found take precedence, just like in the visitor
+    for qname, clazz in other_api.classes.items():
+        if qname not in api.classes:
+            api.add_class(clazz)
+
+    for qname, function in other_api.functions.items():
+        if qname not in api.functions:
+            api.add_function(function)
+
+
+def __module_name(module_path_prefix: str, file: str) -> str:
+    return file.removeprefix(module_path_prefix).removesuffix(".py").replace(os.sep, ".")
@@ -6,6 +6,7 @@ from python_analyzer.utils import declaration_name, parent_qname
 
 
 class API:
+    __slots__ = ("distribution", "package", "version", "classes", "functions")
 
     @staticmethod
     def from_json(json: Any) -> API:
@@ -64,9 +65,9 @@ class API:
         result: dict[str, Parameter] = {}
 
         for function in self.functions.values():
+            parameter_qname_prefix = f"{function.qname}."
             for parameter in function.parameters:
-                parameter_qname = f"{function.qname}.{parameter.name}"
-                result[parameter_qname] = parameter
+                result[parameter_qname_prefix + parameter.name] = parameter
 
         return result
 
@@ -88,18 +89,21 @@ class API:
             "distribution": self.distribution,
             "package": self.package,
             "version": self.version,
+            # The dictionaries are keyed by qualified name, so sorting the keys directly avoids a key function call per
+            # element
             "classes": [
-                clazz.to_json()
-                for clazz in sorted(self.classes.values(), key=lambda it: it.qname)
+                self.classes[qname].to_json()
+                for qname in sorted(self.classes)
             ],
             "functions": [
-                function.to_json()
-                for function in sorted(self.functions.values(), key=lambda it: it.qname)
+                self.functions[qname].to_json()
+                for qname in sorted(self.functions)
             ]
         }
 
 
 class Class:
+    __slots__ = ("qname", "is_public")
 
     @staticmethod
     def from_json(json: Any) -> Class:
@@ -120,6 +124,7 @@ class Class:
 
 
 class Function:
+    __slots__ = ("qname", "parameters", "is_public")
 
     @staticmethod
     def from_json(json: Any) -> Function:
@@ -146,6 +151,7 @@ class Function:
 
 
 class Parameter:
+    __slots__ = ("name", "default_value", "is_public")
 
     @staticmethod
     def from_json(json: Any) -> Parameter:
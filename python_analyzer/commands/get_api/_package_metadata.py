@@ -1,45 +1,51 @@
+import functools
 import importlib
 from pathlib import Path
-from typing import Optional
+from typing import Mapping, Optional
 
 from importlib_metadata import packages_distributions, version
 
 from python_analyzer.utils import list_files
-from ._file_filters import _is_init_file
+from ._file_filters import _is_init_file, _is_test_file, _to_posix_path
 
 
 def package_files(package_name: str) -> list[str]:
+    """
+    :param package_name: The name of the package.
+    :return: The Python files of the package without test files, __init__.py files first.
+    """
+
     root = package_root(package_name)
-    files = list_files(root, ".py")
+    files = [it for it in list_files(root, ".py") if not _is_test_file(_to_posix_path(it))]
     return __move_init_files_to_front(files)
 
 
+@functools.lru_cache(maxsize=None)
 def package_root(package_name: str) -> Path:
     path_as_string = importlib.import_module(package_name).__file__
     return Path(path_as_string).parent
 
 
 def __move_init_files_to_front(files: list[str]) -> list[str]:
-    init_files = []
-    other_files = []
-
-    for file in files:
-        if _is_init_file(file):
-            init_files.append(file)
-        else:
-            other_files.append(file)
-
-    return init_files + other_files
+    # The sort is stable, so the files keep their relative order within both groups
+    files.sort(key=lambda it: not _is_init_file(it))
+    return files
 
 
 def distribution(package_name: str) -> Optional[str]:
-    dist = packages_distributions().get(package_name)
+    dist = __packages_distributions().get(package_name)
     if dist is None or len(dist) == 0:
         return None
 
     return dist[0]
 
 
+@functools.lru_cache(maxsize=1)
+def __packages_distributions() -> Mapping[str, list[str]]:
+    # Building this mapping reads the metadata of every installed distribution, so we only do it once
+    return packages_distributions()
+
+
 def distribution_version(dist: Optional[str]) -> Optional[str]:
     if dist is None:
         return None
@@ -1,4 +1,7 @@
 import json
+from bisect import bisect_left
+from itertools import accumulate
+from operator import itemgetter
 from pathlib import Path
 from typing import Optional, Any
 
@@ -20,9 +23,9 @@ ParameterStore = dict[CallableName, dict[ParameterName, list[Occurrence]]]
 ValueStore = dict[CallableName, dict[ParameterName, dict[str, Any]]]
 
 # Global values
-_relevant_packages = {
+_relevant_packages = frozenset({
     "sklearn",
-}
+})
 
 
 # TODO: step 1: add_implicit_default_values
@@ -59,54 +62,64 @@ def _merge_results(out_dir: Path) -> tuple[ClassStore, CallStore, ParameterStore
 
         print(f"Merging {file} ({index + 1}/{len(files)})")
 
-        with open(file, "r") as f:
-            content = json.load(f)
+        # Decoding the whole file at once is faster than parsing it from the text stream in chunks
+        with open(file, "rb") as f:
+            content = json.loads(f.read())
 
         # merge calls
         call_store: CallStore = content["calls"]
         for callable_name, occurrences in call_store.items():
-            if callable_name not in result_calls:
+            callable_occurrences = result_calls.get(callable_name)
+            if callable_occurrences is None:
                 # not part of the public API
                 continue
 
-            result_calls[callable_name].extend(occurrences)
+            callable_occurrences.extend(occurrences)
 
         # merge parameters
         parameter_store: ParameterStore = content["parameters"]
         for callable_name, parameters in parameter_store.items():
-            if callable_name not in result_parameters:
-                result_parameters[callable_name] = {}
+            callable_parameters = result_parameters.setdefault(callable_name, {})
 
             for parameter_name, occurrences in parameters.items():
-                if parameter_name not in result_parameters[callable_name]:
-                    result_parameters[callable_name][parameter_name] = []
-
-                result_parameters[callable_name][parameter_name].extend(occurrences)
+                parameter_occurrences = callable_parameters.get(parameter_name)
+                if parameter_occurrences is None:
+                    # the loaded list is not used anywhere else, so we can take it over instead of copying it
+                    callable_parameters[parameter_name] = occurrences
+                else:
+                    parameter_occurrences.extend(occurrences)
 
         # merge values
         value_store: ValueStore = content["values"]
         for callable_name, parameters in value_store.items():
-            if callable_name not in result_values:
-                result_values[callable_name] = {}
+            callable_values = result_values.setdefault(callable_name, {})
 
             for parameter_name, values in parameters.items():
-                if parameter_name not in result_values[callable_name]:
-                    result_values[callable_name][parameter_name] = {
+                parameter_data = callable_values.get(parameter_name)
+                if parameter_data is None:
+                    parameter_data = callable_values[parameter_name] = {
                         "defaultValue": None,
                         "values": {}
                     }
 
+                parameter_values = parameter_data["values"]
                 for stringified_value, occurrences in values.items():
-                    if stringified_value not in result_values[callable_name][parameter_name]["values"]:
-                        result_values[callable_name][parameter_name]["values"][stringified_value] = []
-
-                    result_values[callable_name][parameter_name]["values"][stringified_value].extend(occurrences)
+                    value_occurrences = parameter_values.get(stringified_value)
+                    if value_occurrences is None:
+                        parameter_values[stringified_value] = occurrences
+                    else:
+                        value_occurrences.extend(occurrences)
 
     # merge classes
-    for class_name in result_classes.keys():
-        for callable_name, occurrences in result_calls.items():
-            if callable_name.startswith(class_name):
-                result_classes[class_name].extend(occurrences)
+    # Callables of a class are adjacent once sorted, so we find them by binary search instead of checking all callables
+    # for each class
+    sorted_callable_names = sorted(result_calls.keys())
+    for class_name, class_occurrences in result_classes.items():
+        member_prefix = f"{class_name}."
+        index = bisect_left(sorted_callable_names, member_prefix)
+        while index < len(sorted_callable_names) and sorted_callable_names[index].startswith(member_prefix):
+            class_occurrences.extend(result_calls[sorted_callable_names[index]])
+            index += 1
 
     result_occurrences = {
         "classes": result_classes,
@@ -115,8 +128,9 @@ def _merge_results(out_dir: Path) -> tuple[ClassStore, CallStore, ParameterStore
         "values": result_values
     }
 
+    # This file lists every single occurrence and is too large to be read by humans anyway, so it is not indented
     with out_dir.joinpath("$$$$$merged_occurrences$$$$$.json").open("w") as f:
-        json.dump(result_occurrences, f, indent=4)
+        f.write(json.dumps(result_occurrences, separators=(",", ":")))
 
     return result_classes, result_calls, result_parameters, result_values
 
@@ -138,7 +152,7 @@ def _removed_classes(out_dir: Path, class_store: ClassStore):
     unused_public_classes = all_public_classes.difference(used_public_classes)
 
     with out_dir.joinpath("$$$$$merged_class_analysis$$$$$.json").open("w") as f:
-        json.dump(
+        f.write(json.dumps(
             {
                 "all_public_classes": sorted(all_public_classes),
                 "number_of_all_public_classes": len(all_public_classes),
@@ -149,9 +163,8 @@ def _removed_classes(out_dir: Path, class_store: ClassStore):
                 "unused_public_classes": sorted(unused_public_classes),
                 "number_of_unused_public_classes": len(unused_public_classes),
             },
-            f,
             indent=4
-        )
+        ))
 
 
 def _count(
@@ -174,26 +187,29 @@ def _count(
         for callable_name, parameters in result_parameters.items()
     }
 
-    value_counts = {
-        callable_name: {
-            parameter_name: {
+    value_counts = {}
+    for callable_name, parameters in result_values.items():
+        callable_value_counts = value_counts[callable_name] = {}
+        n_calls = call_counts[callable_name]
+
+        for parameter_name, parameter_data in parameters.items():
+            default_value = parameter_data["defaultValue"]
+            values = parameter_data["values"]
+
+            # how often the default value is used (explicitly or implicitly)
+            n_default_value_uses = n_calls - sum(
+                len(occurrences)
+                for stringified_value, occurrences in values.items()
+                if stringified_value != default_value
+            )
+
+            callable_value_counts[parameter_name] = {
                 stringified_value:
                     len(occurrences)
-                    if stringified_value != parameter_data["defaultValue"]
-                    # how often the default value is used (explicitly or implicitly)
-                    else call_counts[callable_name] - sum(
-                        [
-                            len(occurrences)
-                            for inner_stringified_value, occurrences in parameter_data["values"].items()
-                            if inner_stringified_value != parameter_data["defaultValue"]
-                        ]
-                    )
-                for stringified_value, occurrences in parameter_data["values"].items()
+                    if stringified_value != default_value
+                    else n_default_value_uses
+                for stringified_value, occurrences in values.items()
             }
-            for parameter_name, parameter_data in parameters.items()
-        }
-        for callable_name, parameters in result_values.items()
-    }
 
     result_counts = {
         "calls": call_counts,
@@ -201,38 +217,33 @@ def _count(
     }
 
     with out_dir.joinpath("$$$$$merged_counts$$$$$.json").open("w") as f:
-        json.dump(result_counts, f, indent=4)
+        f.write(json.dumps(result_counts, indent=4))
 
     result_counts_compacts = {
         callable_name: {
             "count": call_counts[callable_name],
             "parameters": {
                 parameter_name: {
-                    "values": {
-                        stringified_value: value_count
-                        for stringified_value, value_count in sorted(
-                            values.items(),
-                            key=lambda it: it[1],
-                            reverse=True
-                        )
-                    }
+                    "values": dict(
+                        sorted(value_counts[callable_name][parameter_name].items(), key=itemgetter(1), reverse=True)
+                    )
                 }
-                for parameter_name, values in sorted(
-                    parameters.items(),
-                    key=lambda it: parameter_counts[callable_name][it[0]],
+                for parameter_name in sorted(
+                    value_counts[callable_name].keys(),
+                    key=parameter_counts[callable_name].__getitem__,
                     reverse=True
                 )
             }
         }
-        for callable_name, parameters in sorted(
-            value_counts.items(),
-            key=lambda it: call_counts[it[0]],
+        for callable_name in sorted(
+            value_counts.keys(),
+            key=call_counts.__getitem__,
             reverse=True
         )
     }
 
     with out_dir.joinpath("$$$$$merged_counts_compact$$$$$.json").open("w") as f:
-        json.dump(result_counts_compacts, f, indent=4)
+        f.write(json.dumps(result_counts_compacts, indent=4))
 
     return call_counts, parameter_counts, value_counts
 
@@ -244,22 +255,16 @@ def _count_distribution(out_dir: Path, call_counts: Any, value_counts: Any):
         for callable_name, count in call_counts.items()
         if callable_name.endswith("__init__")
     ]
-    max_instantiation_count = max(flat_class_instantiation_counts)
-
-    class_instantiated_at_most = []
-    for i in range(max_instantiation_count + 1):
-        class_instantiated_at_most_i_times = len([count for count in flat_class_instantiation_counts if count <= i])
-        class_instantiated_at_most.append(class_instantiated_at_most_i_times)
+    class_instantiated_at_most = _count_at_most(flat_class_instantiation_counts)
 
     with out_dir.joinpath("$$$$$merged_class_instantiated_at_most_index_times$$$$$.json").open("w") as f:
-        json.dump(
+        f.write(json.dumps(
             [
                 {"maxInstantiation": index, "classCount": count}
                 for index, count in enumerate(class_instantiated_at_most)
             ],
-            f,
             indent=4
-        )
+        ))
 
     # count functions that are used at most i times
     flat_function_call_counts = [
@@ -267,22 +272,16 @@ def _count_distribution(out_dir: Path, call_counts: Any, value_counts: Any):
         for callable_name, count in call_counts.items()
         if not callable_name.endswith("__init__")
     ]
-    max_function_call_count = max(flat_function_call_counts)
-
-    function_called_at_most = []
-    for i in range(max_function_call_count + 1):
-        function_called_at_most_i_times = len([count for count in flat_function_call_counts if count <= i])
-        function_called_at_most.append(function_called_at_most_i_times)
+    function_called_at_most = _count_at_most(flat_function_call_counts)
 
     with out_dir.joinpath("$$$$$merged_function_called_at_most_index_times$$$$$.json").open("w") as f:
-        json.dump(
+        f.write(json.dumps(
             [
                 {"maxCalls": index, "functionCount": count}
                 for index, count in enumerate(function_called_at_most)
             ],
-            f,
             indent=4
-        )
+        ))
 
     # count parameters where the most commonly used value is used in all but i cases
     flat_parameter_counts = [
@@ -295,19 +294,33 @@ def _count_distribution(out_dir: Path, call_counts: Any, value_counts: Any):
         for callable_name, parameters in value_counts.items()
         for parameter_name in parameters.keys()
     ]
-    max_parameter_count = max(flat_parameter_counts)
-
-    parameter_used_at_most = []
-    for i in range(max_parameter_count + 1):
-        parameter_used_at_most_i_times = len([count for count in flat_parameter_counts if count <= i])
-        parameter_used_at_most.append(parameter_used_at_most_i_times)
+    parameter_used_at_most = _count_at_most(flat_parameter_counts)
 
     with out_dir.joinpath("$$$$$merged_parameter_used_at_most_index_times$$$$$.json").open("w") as f:
-        json.dump(
+        f.write(json.dumps(
             [{"maxUsages": index, "parameterCount": count} for index, count in enumerate(parameter_used_at_most)],
-            f,
             indent=4
-        )
+        ))
+
+
+def _count_at_most(counts: list[int]) -> list[int]:
+    """
+    Computes the cumulative histogram of the given counts in O(max(counts) + len(counts)).
+
+    :param counts: The counts.
+    :return: A list whose entry at index i is the number of counts that are at most i.
+    """
+
+    max_count = max(counts)
+    if max_count < 0:
+        return []
+
+    # Negative counts are at most i for every i, just like 0. Without clamping, they would index from the end.
+    histogram = [0] * (max_count + 1)
+    for count in counts:
+        histogram[max(count, 0)] += 1
+
+    return list(accumulate(histogram))
 
 
 def _affected_occurrences(
@@ -317,48 +330,53 @@ def _affected_occurrences(
     call_counts: Any,
     value_counts: Any
 ) -> None:
-    result = []
-
-    for callable_call_cutoff in range(0, 101):
-        for parameter_usage_cutoff in range(callable_call_cutoff, 101):
-            removed_callables = _callables_called_at_most_n_times(call_counts, callable_call_cutoff)
-            removed_parameters = _parameters_used_at_most_n_times(call_counts, value_counts, parameter_usage_cutoff)
-            n_affected_files = _n_affected_files(result_calls, result_values, removed_callables, removed_parameters)
-            result.append({
-                "callCutoff": callable_call_cutoff,
-                "parameterUsageCutoff": parameter_usage_cutoff,
-                "affectedPrograms": n_affected_files
-            })
-
-    with out_dir.joinpath("$$$$$merged_affected_occurrences$$$$$.json").open("w") as f:
-        json.dump(result, f, indent=4)
+    max_cutoff = 100
+
+    # Raising a cutoff only ever removes more, so we group the affected files by the cutoff from which on they are
+    # affected and accumulate them while sweeping over the cutoffs, instead of collecting them again for every pair
+    files_by_call_cutoff: list[set[FileName]] = [set() for _ in range(max_cutoff + 1)]
+    for callable_name, count in call_counts.items():
+        if count <= max_cutoff:
+            files_by_call_cutoff[count].update(occurrence[0] for occurrence in result_calls[callable_name])
+
+    files_by_parameter_usage_cutoff: list[set[FileName]] = [set() for _ in range(max_cutoff + 1)]
+    for callable_name, parameters in value_counts.items():
+        for parameter_name, values in parameters.items():
+            # uses can only be negative for inconsistent counts, which are then removed for every cutoff
+            n_uses = max(_n_parameter_uses(call_counts, value_counts, callable_name, parameter_name), 0)
+            if n_uses > max_cutoff:
+                continue
 
+            # all values except the most common one are removed
+            most_common_value = _most_common_value(value_counts, callable_name, parameter_name)[0]
+            parameter_values = result_values[callable_name][parameter_name]["values"]
+            for stringified_value in values.keys():
+                if stringified_value != most_common_value:
+                    # if the stringified value is not listed then it's never used explicitly (can only happen when
+                    # another value is used more often than the default)
+                    files_by_parameter_usage_cutoff[n_uses].update(
+                        occurrence[0] for occurrence in parameter_values.get(stringified_value) or []
+                    )
 
-def _callables_called_at_most_n_times(call_counts: Any, n: int) -> list[CallableName]:
-    return [
-        callable_name
-        for callable_name, count in call_counts.items()
-        if count <= n
-    ]
+    result = []
 
+    files_affected_by_callables: set[FileName] = set()
+    for callable_call_cutoff in range(0, max_cutoff + 1):
+        files_affected_by_callables |= files_by_call_cutoff[callable_call_cutoff]
 
-def _parameters_used_at_most_n_times(
-    call_counts: Any,
-    value_counts: Any,
-    n: int
-) -> list[tuple[CallableName, ParameterName, list[StringifiedValue]]]:
-    return [
-        (callable_name, parameter_name, [
-            stringified_value
-            for stringified_value in values.keys()
-            if stringified_value != _most_common_value(value_counts, callable_name, parameter_name)[0]
-        ])
+        affected_files = set(files_affected_by_callables)
+        for parameter_usage_cutoff in range(0, max_cutoff + 1):
+            affected_files |= files_by_parameter_usage_cutoff[parameter_usage_cutoff]
 
-        for callable_name, parameters in value_counts.items()
-        for parameter_name, values in parameters.items()
+            if parameter_usage_cutoff >= callable_call_cutoff:
+                result.append({
+                    "callCutoff": callable_call_cutoff,
+                    "parameterUsageCutoff": parameter_usage_cutoff,
+                    "affectedPrograms": len(affected_files)
+                })
 
-        if _n_parameter_uses(call_counts, value_counts, callable_name, parameter_name) <= n
-    ]
+    with out_dir.joinpath("$$$$$merged_affected_occurrences$$$$$.json").open("w") as f:
+        f.write(json.dumps(result, indent=4))
 
 
 def _most_common_value(
@@ -389,25 +407,3 @@ def _n_parameter_uses(call_counts: Any, value_counts: Any, callable_name: str, p
 
     else:  # otherwise the parameter is set but does not even exist
         return n_parameters_set
-
-
-def _n_affected_files(
-    result_calls: CallStore,
-    result_values: ValueStore,
-    removed_callables: list[CallableName],
-    removed_parameters: list[tuple[CallableName, ParameterName, list[StringifiedValue]]]
-) -> int:
-    affected_files = set()
-
-    for callable_name in removed_callables:
-        for occurrence in result_calls[callable_name]:
-            affected_files.add(occurrence[0])
-
-    for callable_name, parameter_name, stringified_values in removed_parameters:
-        for stringified_value in stringified_values:
-            # if the stringified value is not listed then it's never used explicitly (can only happen when
-            # another value is used more often than the default)
-            for occurrence in (result_values[callable_name][parameter_name]["values"].get(stringified_value) or []):
-                affected_files.add(occurrence[0])
-
-    return len(affected_files)
@@ -1,9 +1,10 @@
 import json
 from io import TextIOWrapper
+from itertools import accumulate
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable
 
-from python_analyzer.commands.find_usages import UsageStore, Usage
+from python_analyzer.commands.find_usages import Location, UsageStore, Usage
 from python_analyzer.commands.get_api import API
 from python_analyzer.utils import ensure_file_exists, parent_qname
 
@@ -27,8 +28,18 @@ def suggest_improvements(
 
     __preprocess_usages(usages, api)
     __print_usage_counts(usages, out_dir, base_file_name)
-    __create_usage_distributions(usages, out_dir, base_file_name)
-    api_size_after_removal = __remove_rarely_used_api_elements(usages, min_usages, out_dir, base_file_name)
+
+    # Removing API elements never changes these counts for the remaining parameters, so we compute them only once
+    n_not_set_to_most_common_value = __count_not_set_to_most_common_value(usages)
+
+    __create_usage_distributions(usages, n_not_set_to_most_common_value, out_dir, base_file_name)
+    api_size_after_removal = __remove_rarely_used_api_elements(
+        usages,
+        n_not_set_to_most_common_value,
+        min_usages,
+        out_dir,
+        base_file_name
+    )
     __write_api_size(api, api_size_after_removal, out_dir, base_file_name)
     __optional_vs_required_parameters(usages, api, out_dir, base_file_name)
 
@@ -45,20 +56,22 @@ def __print_usage_counts(usages, out_dir, base_file_name):
     )
     ensure_file_exists(out_file)
     with out_file.open("w") as f:
-        json.dump(usages.to_count_json(), f, indent=2)
+        f.write(json.dumps(usages.to_count_json(), indent=2))
 
-def __create_usage_distributions(usages: UsageStore, out_dir: Path, base_file_name: str) -> None:
+def __create_usage_distributions(
+    usages: UsageStore,
+    n_not_set_to_most_common_value: dict[str, int],
+    out_dir: Path,
+    base_file_name: str
+) -> None:
     class_usage_distribution = __create_class_or_function_usage_distribution(usages.class_usages)
-    with out_dir.joinpath(f"{base_file_name}__class_usage_distribution.json").open("w") as f:
-        json.dump(class_usage_distribution, f, indent=2)
+    __write_output(out_dir, f"{base_file_name}__class_usage_distribution.json", class_usage_distribution)
 
     function_usage_distribution = __create_class_or_function_usage_distribution(usages.function_usages)
-    with out_dir.joinpath(f"{base_file_name}__function_usage_distribution.json").open("w") as f:
-        json.dump(function_usage_distribution, f, indent=2)
+    __write_output(out_dir, f"{base_file_name}__function_usage_distribution.json", function_usage_distribution)
 
-    parameter_usage_distribution = __create_parameter_usage_distribution(usages)
-    with out_dir.joinpath(f"{base_file_name}__parameter_usage_distribution.json").open("w") as f:
-        json.dump(parameter_usage_distribution, f, indent=2)
+    parameter_usage_distribution = __create_parameter_usage_distribution(usages, n_not_set_to_most_common_value)
+    __write_output(out_dir, f"{base_file_name}__parameter_usage_distribution.json", parameter_usage_distribution)
 
 
 def __create_class_or_function_usage_distribution(usages: dict[str, list[Usage]]) -> dict[int, int]:
@@ -69,50 +82,61 @@ def __create_class_or_function_usage_distribution(usages: dict[str, list[Usage]]
     :return: The usage distribution.
     """
 
-    result = {}
-
     max_usages = max(len(it) for it in usages.values())
-    for i in range(max_usages + 1):
-        result[i] = len([it for it in usages.values() if len(it) >= i])
-
-    return result
+    return __count_at_least((len(it) for it in usages.values()), max_usages)
 
 
-def __create_parameter_usage_distribution(usages: UsageStore) -> dict[int, int]:
+def __create_parameter_usage_distribution(
+    usages: UsageStore,
+    n_not_set_to_most_common_value: dict[str, int]
+) -> dict[int, int]:
     """
     Creates a dictionary X -> N where N indicates the number of parameters that are set at most X times to a value other
     than the most commonly used value (which might differ from the default value).
 
     :param usages: Usage store.
+    :param n_not_set_to_most_common_value: How often each parameter is set to a value other than the most common one.
     :return: The usage distribution.
     """
 
-    result = {}
-
-    function_usages = usages.function_usages
     parameter_usages = usages.parameter_usages
-    value_usages = usages.value_usages
+    max_usages = max(n_not_set_to_most_common_value.values())
 
-    max_usages = max(
-        __n_not_set_to_most_common_value(it, function_usages, value_usages)
-        for it in parameter_usages.keys()
-    )
+    # A parameter is counted for X if its function, its class (if any), and its other values are all used at least X
+    # times, i.e. if the minimum of these counts is at least X
+    def threshold(parameter_qname: str) -> int:
+        function_qname = parent_qname(parameter_qname)
+        class_qname = parent_qname(function_qname)
 
-    for i in range(max_usages + 1):
-        result[i] = len(
-            [
-                it
-                for it in parameter_usages.keys()
-                if usages.n_function_usages(parent_qname(it)) >= i and
-                   (
-                       parent_qname(parent_qname(it)) not in usages.class_usages or
-                       usages.n_class_usages(parent_qname(parent_qname(it))) >= i
-                   ) and
-                   __n_not_set_to_most_common_value(it, function_usages, value_usages) >= i
-            ]
-        )
+        result = min(usages.n_function_usages(function_qname), n_not_set_to_most_common_value[parameter_qname])
+        if class_qname in usages.class_usages:
+            result = min(result, usages.n_class_usages(class_qname))
 
-    return result
+        return result
+
+    return __count_at_least((threshold(it) for it in parameter_usages.keys()), max_usages)
+
+
+def __count_at_least(values: Iterable[int], max_value: int) -> dict[int, int]:
+    """
+    Creates a dictionary X -> N where N indicates how many of the values are at least X, for X from 0 to max_value. It
+    needs a single pass over the values, since the counts are suffix sums of a histogram.
+
+    :param values: The values to count.
+    :param max_value: The largest X to include.
+    :return: The distribution.
+    """
+
+    # Values above max_value are at least X for every X that is included, just like max_value itself
+    histogram = [0] * (max_value + 1)
+    for value in values:
+        if value >= 0:
+            histogram[min(value, max_value)] += 1
+
+    n_at_least = list(accumulate(reversed(histogram)))
+    n_at_least.reverse()
+
+    return dict(enumerate(n_at_least))
 
 
 def __remove_internal_usages(usages: UsageStore, api: API) -> None:
@@ -125,26 +149,35 @@ def __remove_internal_usages(usages: UsageStore, api: API) -> None:
     :param api: Description of the API
     """
 
+    # Collecting the public declarations once turns each check below into a single set lookup
+    public_class_qnames = {qname for qname, clazz in api.classes.items() if clazz.is_public}
+    public_function_qnames = {qname for qname, function in api.functions.items() if function.is_public}
+
     # Internal classes
-    for class_qname in list(usages.class_usages.keys()):
-        if not api.is_public_class(class_qname):
-            print(f"Removing usages of internal class {class_qname}")
-            usages.remove_class(class_qname)
+    internal_class_qnames = [it for it in usages.class_usages if it not in public_class_qnames]
+    __print_removals("class", internal_class_qnames)
+    usages.remove_classes(internal_class_qnames)
 
     # Internal functions
-    for function_qname in list(usages.function_usages.keys()):
-        if not api.is_public_function(function_qname):
-            print(f"Removing usages of internal function {function_qname}")
-            usages.remove_function(function_qname)
+    internal_function_qnames = [it for it in usages.function_usages if it not in public_function_qnames]
+    __print_removals("function", internal_function_qnames)
+    usages.remove_functions(internal_function_qnames)
 
     # Internal parameters
     parameter_qnames = set(api.parameters().keys())
+    internal_parameter_qnames = [
+        it
+        for it in usages.parameter_usages
+        if it not in parameter_qnames or parent_qname(it) not in public_function_qnames
+    ]
+    __print_removals("parameter", internal_parameter_qnames)
+    usages.remove_parameters(internal_parameter_qnames)
 
-    for parameter_qname in list(usages.parameter_usages.keys()):
-        function_qname = parent_qname(parameter_qname)
-        if parameter_qname not in parameter_qnames or not api.is_public_function(function_qname):
-            print(f"Removing usages of internal parameter {parameter_qname}")
-            usages.remove_parameter(parameter_qname)
+
+def __print_removals(kind: str, qnames: list[str]) -> None:
+    # A single write instead of one print per removed declaration
+    if qnames:
+        print("\n".join(f"Removing usages of internal {kind} {qname}" for qname in qnames))
 
 
 def __add_unused_api_elements(usages: UsageStore, api: API) -> None:
@@ -159,28 +192,45 @@ def __add_unused_api_elements(usages: UsageStore, api: API) -> None:
             usages.init_function(function.qname)
 
             # "Public" parameters
+            parameter_qname_prefix = f"{function.qname}."
             for parameter in function.parameters:
-                parameter_qname = f"{function.qname}.{parameter.name}"
+                parameter_qname = parameter_qname_prefix + parameter.name
                 usages.init_parameter(parameter_qname)
                 usages.init_value(parameter_qname)
 
 
 def __add_implicit_usages_of_default_value(usages: UsageStore, api: API) -> None:
+    # All parameters of a function share the locations of its usages, so we only collect them once per function
+    function_locations: dict[str, set[Location]] = {}
+
     for parameter_qname, parameter_usage_list in list(usages.parameter_usages.items()):
         default_value = api.get_default_value(parameter_qname)
         function_qname = parent_qname(parameter_qname)
-        function_usage_list = usages.function_usages[function_qname]
 
-        locations_of_implicit_usages_of_default_value = set(
-            [it.location for it in function_usage_list]
-        ) - set(
-            [it.location for it in parameter_usage_list]
-        )
+        locations_of_function_usages = function_locations.get(function_qname)
+        if locations_of_function_usages is None:
+            locations_of_function_usages = function_locations[function_qname] = {
+                it.location for it in usages.function_usages[function_qname]
+            }
+
+        locations_of_implicit_usages_of_default_value = locations_of_function_usages - {
+            it.location for it in parameter_usage_list
+        }
 
         for location in locations_of_implicit_usages_of_default_value:
             usages.add_value_usage(parameter_qname, default_value, location)
 
 
+def __count_not_set_to_most_common_value(usages: UsageStore) -> dict[str, int]:
+    function_usages = usages.function_usages
+    value_usages = usages.value_usages
+
+    return {
+        it: __n_not_set_to_most_common_value(it, function_usages, value_usages)
+        for it in usages.parameter_usages
+    }
+
+
 def __n_not_set_to_most_common_value(
     parameter_qname: str,
     function_usages: dict[str, list[Usage]],
@@ -189,19 +239,22 @@ def __n_not_set_to_most_common_value(
     """Counts how often a parameter is set to a value other than the most commonly used value."""
 
     n_total_usage = len(function_usages[parent_qname(parameter_qname)])
+    values = value_usages[parameter_qname]
 
     # Parameter is unused
     # Checking both conditions even though one implies the other to ensure correctness of the program
-    if n_total_usage == 0 and len(value_usages[parameter_qname].values()) == 0:
+    if n_total_usage == 0 and len(values) == 0:
         return 0
 
-    n_set_to_most_commonly_used_value = max(len(it) for it in value_usages[parameter_qname].values())
+    # The usage lists already know their lengths, so this only compares one count per distinct value
+    n_set_to_most_commonly_used_value = max(map(len, values.values()))
 
     return n_total_usage - n_set_to_most_commonly_used_value
 
 
 def __remove_rarely_used_api_elements(
     usages: UsageStore,
+    n_not_set_to_most_common_value: dict[str, int],
     min_usages: int,
     out_dir: Path,
     base_file_name: str
@@ -218,8 +271,7 @@ def __remove_rarely_used_api_elements(
         len(usages.function_usages),
         len(usages.parameter_usages)
     )
-    with out_dir.joinpath(f"{base_file_name}__classes_used_fewer_than_{min_usages}_times.json").open("w") as f:
-        json.dump(rarely_used_classes, f, indent=2)
+    __write_output(out_dir, f"{base_file_name}__classes_used_fewer_than_{min_usages}_times.json", rarely_used_classes)
 
     rarely_used_functions = __remove_rarely_used_functions(usages, min_usages)
     api_size_after_unused_function_removal = __api_size_to_json(
@@ -227,8 +279,11 @@ def __remove_rarely_used_api_elements(
         len(usages.function_usages),
         len(usages.parameter_usages)
     )
-    with out_dir.joinpath(f"{base_file_name}__functions_used_fewer_than_{min_usages}_times.json").open("w") as f:
-        json.dump(rarely_used_functions, f, indent=2)
+    __write_output(
+        out_dir,
+        f"{base_file_name}__functions_used_fewer_than_{min_usages}_times.json",
+        rarely_used_functions
+    )
 
     rarely_used_parameters = __remove_rarely_used_parameters(usages, min_usages)
     api_size_after_unused_parameter_removal = __api_size_to_json(
@@ -236,17 +291,23 @@ def __remove_rarely_used_api_elements(
         len(usages.function_usages),
         len(usages.parameter_usages)
     )
-    with out_dir.joinpath(f"{base_file_name}__parameters_used_fewer_than_{min_usages}_times.json").open("w") as f:
-        json.dump(rarely_used_parameters, f, indent=2)
+    __write_output(
+        out_dir,
+        f"{base_file_name}__parameters_used_fewer_than_{min_usages}_times.json",
+        rarely_used_parameters
+    )
 
-    mostly_useless_parameters = __remove_mostly_useless_parameters(usages, min_usages)
+    mostly_useless_parameters = __remove_mostly_useless_parameters(usages, n_not_set_to_most_common_value, min_usages)
     api_size_after_useless_parameter_removal = __api_size_to_json(
         len(usages.class_usages),
         len(usages.function_usages),
         len(usages.parameter_usages)
     )
-    with out_dir.joinpath(f"{base_file_name}__parameters_set_fewer_than_{min_usages}_times_to_value_other_than_most_common.json").open("w") as f:
-        json.dump(mostly_useless_parameters, f, indent=2)
+    __write_output(
+        out_dir,
+        f"{base_file_name}__parameters_set_fewer_than_{min_usages}_times_to_value_other_than_most_common.json",
+        mostly_useless_parameters
+    )
 
     return {
         "after_unused_class_removal": api_size_after_unused_class_removal,
@@ -257,47 +318,41 @@ def __remove_rarely_used_api_elements(
 
 
 def __remove_rarely_used_classes(usages: UsageStore, min_usages: int) -> list[str]:
-    result = []
-
-    for class_qname in list(usages.class_usages.keys()):
-        if usages.n_class_usages(class_qname) < min_usages:
-            result.append(class_qname)
-            usages.remove_class(class_qname)
-
-    return sorted(result)
+    result = [qname for qname, class_usages in usages.class_usages.items() if len(class_usages) < min_usages]
+    usages.remove_classes(result)
+    result.sort()
+    return result
 
 
 def __remove_rarely_used_functions(usages: UsageStore, min_usages: int) -> list[str]:
-    result = []
-
-    for function_qname in list(usages.function_usages.keys()):
-        if usages.n_function_usages(function_qname) < min_usages:
-            result.append(function_qname)
-            usages.remove_function(function_qname)
-
-    return sorted(result)
+    result = [qname for qname, function_usages in usages.function_usages.items() if len(function_usages) < min_usages]
+    usages.remove_functions(result)
+    result.sort()
+    return result
 
 def __remove_rarely_used_parameters(usages: UsageStore, min_usages: int) -> list[str]:
-    result = []
-
-    for parameter_qname in list(usages.parameter_usages.keys()):
-        if usages.n_parameter_usages(parameter_qname) < min_usages:
-            result.append(parameter_qname)
-            usages.remove_parameter(parameter_qname)
-
-    return sorted(result)
-
-def __remove_mostly_useless_parameters(usages: UsageStore, min_usages: int) -> list[str]:
-    result = []
-
-    for parameter_qname in list(usages.parameter_usages.keys()):
-        usage_count = __n_not_set_to_most_common_value(parameter_qname, usages.function_usages, usages.value_usages)
-
-        if usage_count < min_usages:
-            result.append(parameter_qname)
-            usages.remove_parameter(parameter_qname)
+    result = [
+        qname
+        for qname, parameter_usages in usages.parameter_usages.items()
+        if len(parameter_usages) < min_usages
+    ]
+    usages.remove_parameters(result)
+    result.sort()
+    return result
 
-    return sorted(result)
+def __remove_mostly_useless_parameters(
+    usages: UsageStore,
+    n_not_set_to_most_common_value: dict[str, int],
+    min_usages: int
+) -> list[str]:
+    result = [
+        parameter_qname
+        for parameter_qname in usages.parameter_usages
+        if n_not_set_to_most_common_value[parameter_qname] < min_usages
+    ]
+    usages.remove_parameters(result)
+    result.sort()
+    return result
 
 
 def __write_api_size(
@@ -306,23 +361,27 @@ def __write_api_size(
     out_dir: Path,
     base_file_name: str
 ) -> None:
-    with out_dir.joinpath(f"{base_file_name}__api_size.json").open("w") as f:
-        json.dump({
-            "full": __api_size_to_json(
-                api.class_count(),
-                api.function_count(),
-                api.parameter_count()
-            ),
-            "public": __api_size_to_json(
-                api.public_class_count(),
-                api.public_function_count(),
-                api.public_parameter_count()
-            ),
-            "after_unused_class_removal": api_size_after_removal["after_unused_class_removal"],
-            "after_unused_function_removal": api_size_after_removal["after_unused_function_removal"],
-            "after_unused_parameter_removal": api_size_after_removal["after_unused_parameter_removal"],
-            "after_useless_parameter_removal": api_size_after_removal["after_useless_parameter_removal"]
-        }, f, indent=2)
+    __write_output(out_dir, f"{base_file_name}__api_size.json", {
+        "full": __api_size_to_json(
+            api.class_count(),
+            api.function_count(),
+            api.parameter_count()
+        ),
+        "public": __api_size_to_json(
+            api.public_class_count(),
+            api.public_function_count(),
+            api.public_parameter_count()
+        ),
+        "after_unused_class_removal": api_size_after_removal["after_unused_class_removal"],
+        "after_unused_function_removal": api_size_after_removal["after_unused_function_removal"],
+        "after_unused_parameter_removal": api_size_after_removal["after_unused_parameter_removal"],
+        "after_useless_parameter_removal": api_size_after_removal["after_useless_parameter_removal"]
+    })
+
+
+def __write_output(out_dir: Path, file_name: str, content: Any) -> None:
+    with out_dir.joinpath(file_name).open("w") as f:
+        f.write(json.dumps(content, indent=2))
 
 
 def __api_size_to_json(n_classes: int, n_functions: int, n_parameters: int) -> Any:
@@ -1,3 +1,4 @@
-from ._ASTWalker import ASTWalker
-from ._files import ensure_file_exists, initialize_and_read_exclude_file, list_files
+from ._ast_cache import parse_cached
+from ._cache_files import cache_file, read_cache_file, write_cache_file
+from ._files import ensure_file_exists, file_contains, initialize_and_read_exclude_file, list_files, read_source
 from ._qnames import declaration_name, parent_qname
@@ -0,0 +1,40 @@
+import pickle
+from typing import Optional
+
+import astroid
+
+from ._cache_files import cache_file, read_cache_file, write_cache_file
+
+__CACHE_DIR_ENVIRONMENT_VARIABLE = "PYTHON_ANALYZER_AST_CACHE"
+
+
+def parse_cached(source: str, module_name: str = "", path: Optional[str] = None) -> astroid.Module:
+    """
+    Parses the source code with astroid. If the environment variable PYTHON_ANALYZER_AST_CACHE is set to a directory,
+    the parsed module is pickled there and reused on subsequent runs for the same source code. Modules that cannot be
+    pickled are simply parsed again next time.
+
+    Cached entries are unpickled, so the cache directory must only be writable by trusted users.
+
+    :param source: The source code to parse.
+    :param module_name: The name of the module.
+    :param path: The path of the file containing the source code.
+    :return: The parsed module.
+    """
+
+    # The module name and path are part of the key since astroid derives the package status of the module from them
+    file = cache_file(__CACHE_DIR_ENVIRONMENT_VARIABLE, (module_name, path), source, ".pkl")
+    if file is None:
+        return astroid.parse(source, module_name=module_name, path=path)
+
+    data = read_cache_file(file)
+    if data is not None:
+        try:
+            return pickle.loads(data)
+        except Exception:  # pylint: disable=broad-except
+            # Truncated or outdated entries of any kind are treated like cache misses
+            pass
+
+    module = astroid.parse(source, module_name=module_name, path=path)
+    write_cache_file(file, lambda f: pickle.dump(module, f, protocol=pickle.HIGHEST_PROTOCOL))
+    return module
@@ -0,0 +1,70 @@
+import hashlib
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterable, Optional
+
+import astroid
+
+
+def cache_file(environment_variable: str, key_parts: Iterable[object], source: str, suffix: str) -> Optional[Path]:
+    """
+    Returns the file that caches a result derived from the given source code, or None if caching is disabled.
+
+    :param environment_variable: The environment variable that holds the cache directory. Caching is disabled if it is
+    not set.
+    :param key_parts: Everything besides the source code and the versions of astroid and Python that the result depends
+    on.
+    :param source: The source code.
+    :param suffix: The suffix of the cache file.
+    :return: The cache file, which may not exist yet.
+    """
+
+    cache_dir = os.environ.get(environment_variable)
+    if not cache_dir:
+        return None
+
+    hasher = hashlib.sha256()
+    hasher.update("".join(f"{it}\0" for it in (astroid.__version__, sys.version, *key_parts)).encode())
+    hasher.update(source.encode("utf-8", errors="surrogatepass"))
+    key = hasher.hexdigest()
+
+    return Path(cache_dir).joinpath(key[:2], f"{key}{suffix}")
+
+
+def read_cache_file(file: Path) -> Optional[bytes]:
+    """
+    :param file: The cache file.
+    :return: The content of the cache file or None if it cannot be read.
+    """
+
+    try:
+        with file.open("rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def write_cache_file(file: Path, write: Callable[[BinaryIO], None]) -> None:
+    """
+    Writes a cache file atomically, so concurrent readers never see a partial entry. Caching is best effort, so all
+    errors are ignored and the partial entry is removed.
+
+    :param file: The cache file.
+    :param write: Writes the content to the given binary file.
+    """
+
+    try:
+        file.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_file = tempfile.mkstemp(dir=file.parent, suffix=".tmp")
+    except OSError:
+        return
+
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp_file, file)
+    except Exception:  # pylint: disable=broad-except
+        # Writing fails in many ways, e.g. wrapt object proxies in astroid trees raise NotImplementedError when pickled
+        Path(tmp_file).unlink(missing_ok=True)
@@ -1,6 +1,11 @@
+import io
+import mmap
 import os
+import tokenize
 from pathlib import Path
-from typing import TextIO
+from typing import Callable, TextIO
+
+__MMAP_THRESHOLD = 256 * 1024
 
 
 def list_files(root_dir: Path, extension: str = "") -> list[str]:
@@ -12,14 +17,82 @@ def list_files(root_dir: Path, extension: str = "") -> list[str]:
 
     result: list[str] = []
 
-    for root, _, files in os.walk(root_dir):
-        for filename in files:
-            if filename.endswith(extension):
-                result.append(str(os.path.join(root, filename)))
+    # os.scandir reports the type of each entry along with its name, so unlike os.walk we need no further stat calls
+    # to tell files and directories apart. Like os.walk, we skip unreadable directories and do not follow symlinks to
+    # directories.
+    directories = [str(root_dir)]
+    while directories:
+        directory = directories.pop()
+
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+
+                    if not is_dir:
+                        if entry.name.endswith(extension):
+                            result.append(entry.path)
+                    elif not entry.is_symlink():
+                        directories.append(entry.path)
+        except OSError:
+            continue
 
     return result
 
 
+def read_source(file: str) -> str:
+    """
+    Reads a source file as bytes and decodes it once, using the encoding declared by its byte order mark or its PEP 263
+    encoding declaration (UTF-8 by default). Large files are memory-mapped, so they are decoded without copying them
+    into an intermediate buffer first.
+
+    :param file: The path to the file.
+    :return: The content of the file.
+    :raises UnicodeDecodeError: If the file is not valid in its encoding.
+    """
+
+    with open(file, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < __MMAP_THRESHOLD:
+            data = f.read()
+            return data.decode(__detect_encoding(io.BytesIO(data).readline))
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return str(mm, __detect_encoding(mm.readline))
+
+
+def __detect_encoding(readline: Callable[[], bytes]) -> str:
+    # Only the first two lines are read. Invalid declarations are treated like missing ones, so the file is reported as
+    # broken by the UTF-8 decoder if it is not valid UTF-8 either.
+    try:
+        encoding, _ = tokenize.detect_encoding(readline)
+        return encoding
+    except SyntaxError:
+        return "utf-8"
+
+
+def file_contains(file: str, needle: bytes) -> bool:
+    """
+    Checks whether a file contains the given bytes without decoding it. Large files are memory-mapped, so they are
+    searched without reading them into memory first.
+
+    :param file: The path to the file.
+    :param needle: The bytes to search for.
+    :return: Whether the file contains the bytes.
+    """
+
+    with open(file, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < __MMAP_THRESHOLD:
+            return needle in f.read()
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm.find(needle) != -1
+
+
 def ensure_file_exists(file: Path) -> None:
     """
     Creates a file and all parent directories if they don't exist already.
@@ -41,7 +114,8 @@ def initialize_and_read_exclude_file(exclude_file: Path) -> list[str]:
 
 
 def __read_lines(f: TextIO) -> list[str]:
-    return [it.strip() for it in f.readlines() if it != ""]
+    # Lines are compared after stripping, so blank lines (e.g. a trailing newline) are skipped
+    return [it for it in map(str.strip, f.read().splitlines()) if it]
 
 
 def __write_lines(f: TextIO, lines: list[str]) -> None:
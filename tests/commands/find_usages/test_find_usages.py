@@ -0,0 +1,37 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from python_analyzer.commands.find_usages import Location, UsageStore
+from python_analyzer.commands.find_usages import _find_usages
+
+
+def _usages_line(python_file: str) -> str:
+    usages = UsageStore()
+    usages.add_function_usage("package.function", Location(python_file, 1, 0))
+    return json.dumps({"file": python_file, "usages": usages.to_json()})
+
+
+def _start_worker(tmp_dir: Path) -> None:
+    _find_usages.__initialize_process_environment("package", None, tmp_dir)
+
+
+def test_merge_results_after_resuming_over_truncated_shard(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    # Both workers get the same PID, like a worker of a resumed analysis in a container
+    monkeypatch.setattr(_find_usages.os, "getpid", lambda: 42)
+
+    # The first worker crashes while writing its second line
+    _start_worker(tmp_path)
+    _find_usages._shard.write(f"{_usages_line('first.py')}\n")
+    _find_usages._shard.write(_usages_line("crashed.py")[:20])
+    _find_usages._shard.flush()
+
+    # The resumed worker analyzes another file
+    _start_worker(tmp_path)
+    _find_usages._shard.write(f"{_usages_line('resumed.py')}\n")
+    _find_usages._shard.flush()
+
+    result = _find_usages._merge_results(tmp_path)
+
+    assert sorted(it.location.file for it in result.function_usages["package.function"]) == ["first.py", "resumed.py"]